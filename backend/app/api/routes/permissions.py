@@ -3,18 +3,56 @@ Permission Management API Routes.
 Endpoints for app permission control and audit logs.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import List
 from datetime import datetime
+from itertools import islice
+import sys
+from cachetools import TTLCache
 
 from app.models.schemas import (
     AppPermission, PermissionAudit, PermissionType,
     APIResponse
 )
-from app.core.ai_firewall import permission_gate
+from app.core.ai_firewall import permission_gate, entry_time
 
 router = APIRouter()
 
+# Permission value -> enum member, computed once instead of per audit/list item.
+# Keys are interned so lookups with the stored permission strings hit the
+# identity fast path.
+_PERM_BY_VALUE = {sys.intern(p.value): p for p in PermissionType}
+
+# Short-lived cache for the polled read endpoints. Keys include
+# permission_gate.version, so any grant/revoke makes older entries unreachable.
+_read_cache = TTLCache(maxsize=8, ttl=0.5)
+
+# Static payload for the educational /types endpoint, built once at import
+_PERMISSION_TYPES_INFO = {
+    "permissions": {
+        "motor_intent": {
+            "description": "Basic motor commands (safe)",
+            "risk_level": "low",
+            "data_exposed": ["Beta band (focus)", "Intentional command detection"]
+        },
+        "focus_level": {
+            "description": "Attention and concentration metrics",
+            "risk_level": "low",
+            "data_exposed": ["Beta/Alpha ratio", "Focus score"]
+        },
+        "emotional_state": {
+            "description": "Emotional and stress indicators",
+            "risk_level": "medium",
+            "data_exposed": ["Theta band (emotion)", "Alpha band (relaxation)"]
+        },
+        "full_spectrum": {
+            "description": "Complete neural data (dangerous!)",
+            "risk_level": "critical",
+            "data_exposed": ["All frequency bands", "Raw EEG", "Subconscious data"]
+        }
+    }
+}
+
 
 @router.get("/list", response_model=List[AppPermission])
 async def list_permissions():
@@ -22,13 +60,18 @@ async def list_permissions():
     Get all app permissions.
     Shows which apps have what permissions.
     """
+    cache_key = ('list', permission_gate.version)
+    cached = _read_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     permissions_list = []
+    now = datetime.now()
     
     for app_id, perm_data in permission_gate.permissions.items():
         # Convert string permissions to enum
         granted_perms = [
-            PermissionType(p) if p in [e.value for e in PermissionType]
-            else PermissionType.MOTOR_INTENT
+            _PERM_BY_VALUE.get(p, PermissionType.MOTOR_INTENT)
             for p in perm_data['granted']
         ]
         
@@ -38,10 +81,11 @@ async def list_permissions():
                 app_name=perm_data['app_name'],
                 requested_permissions=granted_perms,
                 granted=True,
-                timestamp=datetime.now()
+                timestamp=now
             )
         )
     
+    _read_cache[cache_key] = permissions_list
     return permissions_list
 
 
@@ -50,6 +94,8 @@ async def grant_permission(app_id: str, app_name: str, permission: PermissionTyp
     """
     Grant a permission to an application.
     """
+    # Interned so the permission_gate lookups reuse one cached hash
+    app_id = sys.intern(app_id)
     try:
         permission_gate.grant_permission(app_id, app_name, permission.value)
         
@@ -72,6 +118,7 @@ async def revoke_permission(app_id: str, permission: PermissionType):
     """
     Revoke a permission from an application.
     """
+    app_id = sys.intern(app_id)
     try:
         permission_gate.revoke_permission(app_id, permission.value)
         
@@ -93,14 +140,10 @@ async def revoke_all_permissions(app_id: str):
     """
     Revoke all permissions from an application.
     """
+    app_id = sys.intern(app_id)
     try:
-        if app_id in permission_gate.permissions:
-            app_name = permission_gate.permissions[app_id]['app_name']
-            # Create a copy of the list to avoid modification issues while iterating
-            granted = list(permission_gate.permissions[app_id]['granted'])
-            for perm in granted:
-                permission_gate.revoke_permission(app_id, perm)
-            
+        app_name = permission_gate.revoke_all(app_id)
+        if app_name is not None:
             return APIResponse(
                 success=True,
                 message=f"Revoked all permissions from {app_name}",
@@ -118,22 +161,24 @@ async def revoke_all_permissions(app_id: str):
 
 
 @router.get("/audit", response_model=List[PermissionAudit])
-async def get_audit_log(limit: int = 50):
+async def get_audit_log(limit: int = Query(50, ge=1)):
     """
     Get permission audit trail.
     Shows all permission grant/revoke events.
     """
+    cache_key = ('audit', permission_gate.version, limit)
+    cached = _read_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     # Get recent audit entries
-    recent_logs = permission_gate.audit_log[-limit:]
+    # Walk the bounded log from the newest end so only `limit` entries are touched
+    recent_logs = reversed(list(islice(reversed(permission_gate.audit_log), limit)))
     
     audit_list = []
     for log in recent_logs:
         # Convert to enum if valid
-        perm_type = log['permission']
-        if perm_type in [e.value for e in PermissionType]:
-            perm_enum = PermissionType(perm_type)
-        else:
-            perm_enum = PermissionType.MOTOR_INTENT
+        perm_enum = _PERM_BY_VALUE.get(log['permission'], PermissionType.MOTOR_INTENT)
         
         audit_list.append(
             PermissionAudit(
@@ -141,10 +186,11 @@ async def get_audit_log(limit: int = 50):
                 app_name=log['app_name'],
                 action=log['action'],
                 permission_type=perm_enum,
-                timestamp=datetime.fromisoformat(log['timestamp'])
+                timestamp=entry_time(log)
             )
         )
     
+    _read_cache[cache_key] = audit_list
     return audit_list
 
 
@@ -157,30 +203,7 @@ async def get_permission_types():
     return APIResponse(
         success=True,
         message="Available permission types",
-        data={
-            "permissions": {
-                "motor_intent": {
-                    "description": "Basic motor commands (safe)",
-                    "risk_level": "low",
-                    "data_exposed": ["Beta band (focus)", "Intentional command detection"]
-                },
-                "focus_level": {
-                    "description": "Attention and concentration metrics",
-                    "risk_level": "low",
-                    "data_exposed": ["Beta/Alpha ratio", "Focus score"]
-                },
-                "emotional_state": {
-                    "description": "Emotional and stress indicators",
-                    "risk_level": "medium",
-                    "data_exposed": ["Theta band (emotion)", "Alpha band (relaxation)"]
-                },
-                "full_spectrum": {
-                    "description": "Complete neural data (dangerous!)",
-                    "risk_level": "critical",
-                    "data_exposed": ["All frequency bands", "Raw EEG", "Subconscious data"]
-                }
-            }
-        }
+        data=_PERMISSION_TYPES_INFO
     )
 
 
@@ -4,18 +4,49 @@ Endpoints for managing user privacy settings.
 """
 
 from fastapi import APIRouter, HTTPException
+from dataclasses import dataclass, asdict
+from typing import Optional
 from app.models.schemas import PrivacyLevel, PrivacyStatus, APIResponse
 from app.config import settings
 
 router = APIRouter()
 
+# Settings read on every request, bound once at import
+_DEFAULT_EPSILON = settings.DEFAULT_EPSILON
+
+
+@dataclass(slots=True)
+class PrivacyState:
+    """Current privacy parameters."""
+    level: float
+    epsilon: float
+    delta: float
+
+
 # Global privacy state (in production, use database)
-current_privacy_state = {
-    "level": settings.DEFAULT_PRIVACY_LEVEL,
-    "epsilon": settings.DEFAULT_EPSILON,
-    "delta": settings.DEFAULT_DELTA
+current_privacy_state = PrivacyState(
+    level=settings.DEFAULT_PRIVACY_LEVEL,
+    epsilon=settings.DEFAULT_EPSILON,
+    delta=settings.DEFAULT_DELTA
+)
+
+# /status response, rebuilt only after the privacy level changes
+_cached_status: Optional[PrivacyStatus] = None
+
+# Static parts of the educational /info payload
+_PRIVACY_LEVELS_INFO = {
+    "0.0-0.3": "Maximum Privacy - Heavy noise, strong protection, reduced utility",
+    "0.4-0.6": "Balanced - Moderate noise, good protection, decent utility",
+    "0.7-1.0": "Maximum Utility - Light noise, basic protection, high utility"
 }
 
+_PROTECTED_DATA_INFO = [
+    "Individual brain signatures (fingerprinting prevention)",
+    "Subconscious emotional states",
+    "Memory and cognitive patterns",
+    "Sensitive frequency band data"
+]
+
 
 @router.post("/set-level", response_model=APIResponse)
 async def set_privacy_level(privacy: PrivacyLevel):
@@ -25,17 +56,19 @@ async def set_privacy_level(privacy: PrivacyLevel):
     - 0.0 = Maximum privacy (more noise, less utility)
     - 1.0 = Maximum utility (less noise, more data exposure)
     """
+    global _cached_status
     try:
-        current_privacy_state["level"] = privacy.level
+        current_privacy_state.level = privacy.level
         
         # Adjust epsilon based on level
         # Higher level = higher epsilon = less noise
-        current_privacy_state["epsilon"] = settings.DEFAULT_EPSILON * (privacy.level + 0.1)
+        current_privacy_state.epsilon = _DEFAULT_EPSILON * (privacy.level + 0.1)
+        _cached_status = None
         
         return APIResponse(
             success=True,
             message=f"Privacy level updated to {privacy.level:.2f}",
-            data=current_privacy_state
+            data=asdict(current_privacy_state)
         )
         
     except Exception as e:
@@ -45,12 +78,15 @@ async def set_privacy_level(privacy: PrivacyLevel):
 @router.get("/status", response_model=PrivacyStatus)
 async def get_privacy_status():
     """Get current privacy configuration."""
-    return PrivacyStatus(
-        current_level=current_privacy_state["level"],
-        epsilon=current_privacy_state["epsilon"],
-        delta=current_privacy_state["delta"],
-        noise_applied=True
-    )
+    global _cached_status
+    if _cached_status is None:
+        _cached_status = PrivacyStatus(
+            current_level=current_privacy_state.level,
+            epsilon=current_privacy_state.epsilon,
+            delta=current_privacy_state.delta,
+            noise_applied=True
+        )
+    return _cached_status
 
 
 @router.get("/info", response_model=APIResponse)
@@ -64,27 +100,18 @@ async def get_privacy_info():
         message="Privacy protection information",
         data={
             "mechanism": "Differential Privacy (Laplacian Noise)",
-            "current_level": current_privacy_state["level"],
-            "levels": {
-                "0.0-0.3": "Maximum Privacy - Heavy noise, strong protection, reduced utility",
-                "0.4-0.6": "Balanced - Moderate noise, good protection, decent utility",
-                "0.7-1.0": "Maximum Utility - Light noise, basic protection, high utility"
-            },
+            "current_level": current_privacy_state.level,
+            "levels": _PRIVACY_LEVELS_INFO,
             "parameters": {
                 "epsilon": {
-                    "current": current_privacy_state["epsilon"],
+                    "current": current_privacy_state.epsilon,
                     "description": "Privacy budget - lower means more privacy"
                 },
                 "delta": {
-                    "current": current_privacy_state["delta"],
+                    "current": current_privacy_state.delta,
                     "description": "Probability of privacy breach"
                 }
             },
-            "what_is_protected": [
-                "Individual brain signatures (fingerprinting prevention)",
-                "Subconscious emotional states",
-                "Memory and cognitive patterns",
-                "Sensitive frequency band data"
-            ]
+            "what_is_protected": _PROTECTED_DATA_INFO
         }
     )
@@ -3,28 +3,61 @@ Signal Processing API Routes.
 Endpoints for EEG signal ingestion and processing.
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict
+from fastapi import APIRouter, Body, HTTPException, Header, Response
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import anyio
+import orjson
 
 from app.models.schemas import (
     EEGSignalInput, SyntheticEEGRequest,
     SignalProcessingResult, FrequencyBands,
     IntentClassification, IntentType, APIResponse
 )
-from app.core.signal_processing import SignalProcessor
-from app.core.ai_firewall import intent_classifier
+from app.core.signal_processing import SignalProcessor, EEGBuffer
+from app.core.ai_firewall import intent_classifier, INTENT_LABELS
 from app.core.privacy_engine import PrivacyEngine
 from app.utils.eeg_generator import SyntheticEEGGenerator
 from app.config import settings
 
 router = APIRouter()
 
+# Settings read on every request, bound once at import
+_DEFAULT_PRIVACY_LEVEL = settings.DEFAULT_PRIVACY_LEVEL
+_SAMPLING_RATE = settings.SAMPLING_RATE
+
+# Largest batch /classify_batch accepts (larger requests get a 422)
+_MAX_CLASSIFY_BATCH = 10_000
+
 # Initialize components
 signal_processor = SignalProcessor(settings.SAMPLING_RATE)
 privacy_engine = PrivacyEngine(settings.DEFAULT_EPSILON, settings.DEFAULT_DELTA)
 eeg_generator = SyntheticEEGGenerator(settings.SAMPLING_RATE, settings.NUM_CHANNELS)
 
+# Static band descriptions for the educational /bands endpoint
+_FREQUENCY_BANDS_INFO = {
+    "delta": {
+        "range": "0.5-4 Hz",
+        "description": "Deep sleep, unconscious processes"
+    },
+    "theta": {
+        "range": "4-8 Hz",
+        "description": "Drowsiness, meditation, memory, emotion"
+    },
+    "alpha": {
+        "range": "8-13 Hz",
+        "description": "Relaxation, calm, closed eyes"
+    },
+    "beta": {
+        "range": "13-30 Hz",
+        "description": "Active thinking, focus, motor planning"
+    },
+    "gamma": {
+        "range": "30-100 Hz",
+        "description": "High-level cognition, perception, consciousness"
+    }
+}
+
 
 @router.post("/process", response_model=SignalProcessingResult)
 async def process_eeg_signal(signal_input: EEGSignalInput):
@@ -42,9 +75,12 @@ async def process_eeg_signal(signal_input: EEGSignalInput):
     """
     try:
         # Step 1: Process signal and extract features
-        features, cleaned_channels = signal_processor.process_pipeline(
-            signal_input.channels,
-            clean=True
+        # (filtering + FFT is CPU-bound, so keep it off the event loop)
+        eeg = EEGBuffer.from_channels(signal_input.channels)
+        features, cleaned = await anyio.to_thread.run_sync(
+            signal_processor.process_pipeline,
+            eeg,
+            True
         )
         
         # Step 2: Classify intent
@@ -60,19 +96,27 @@ async def process_eeg_signal(signal_input: EEGSignalInput):
         }
         
         # Step 4: Apply differential privacy
-        privacy_level = settings.DEFAULT_PRIVACY_LEVEL
+        privacy_level = _DEFAULT_PRIVACY_LEVEL
         protected_bands = privacy_engine.privatize_frequency_bands(
             bands,
             privacy_level=privacy_level
         )
         
+        # Map the classifier label straight to its enum member
+        try:
+            intent_enum = IntentType._value2member_map_[intent_type]
+        except KeyError:
+            intent_enum = IntentType(intent_type)
+        
         # Step 5: Create response
-        result = SignalProcessingResult(
-            original_channels=len(signal_input.channels),
+        # Everything below is produced by our own pipeline (the user input was
+        # validated on the way in), so skip re-validating it field by field
+        result = SignalProcessingResult.model_construct(
+            original_channels=len(eeg),
             sampling_rate=signal_input.sampling_rate,
-            frequency_bands=FrequencyBands(**protected_bands),
-            intent_classification=IntentClassification(
-                intent_type=IntentType(intent_type),
+            frequency_bands=FrequencyBands.model_construct(**protected_bands),
+            intent_classification=IntentClassification.model_construct(
+                intent_type=intent_enum,
                 confidence=confidence,
                 explanation=explanation
             ),
@@ -87,31 +131,144 @@ async def process_eeg_signal(signal_input: EEGSignalInput):
         raise HTTPException(status_code=500, detail=f"Signal processing failed: {str(e)}")
 
 
+def _classify_features(features_list: List[Dict[str, float]]):
+    """Feature dicts -> (codes, confidences), via one feature matrix."""
+    X = intent_classifier.feature_matrix(features_list)
+    return intent_classifier.classify_batch(X)
+
+
+@router.post("/classify_batch", response_model=APIResponse)
+async def classify_feature_batch(
+    features_list: List[Dict[str, float]] = Body(..., max_length=_MAX_CLASSIFY_BATCH)
+):
+    """
+    Classify intent for many feature windows in one call.
+    
+    Intended for streaming clients that buffer windows from one or more
+    devices; each item uses the feature keys returned by the pipeline
+    (band powers and ratios). Missing features count as 0. At most
+    10,000 windows are accepted per call.
+    """
+    try:
+        # Building and scoring the matrix is CPU-bound, so keep it off the event loop
+        codes, confidences = await anyio.to_thread.run_sync(_classify_features, features_list)
+        
+        return APIResponse(
+            success=True,
+            message=f"Classified {len(features_list)} windows",
+            data={
+                "results": [
+                    {"intent_type": INTENT_LABELS[code], "confidence": confidence}
+                    for code, confidence in zip(codes.tolist(), confidences.tolist())
+                ]
+            }
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch classification failed: {str(e)}")
+
+
+def _accept_quality(accept: str, media_type: str) -> Tuple[float, int]:
+    """
+    q-value the Accept header gives `media_type`, from its most specific range.
+    
+    Returns (q, specificity) where specificity is 2 for an exact match,
+    1 for `type/*`, 0 for `*/*` and -1 when no range matches (q is then 0).
+    """
+    main_type = media_type.split('/')[0]
+    best_q, best_rank = 0.0, -1
+    for media_range in accept.split(','):
+        name, *params = [part.strip() for part in media_range.split(';')]
+        name = name.lower()
+        if name == media_type:
+            rank = 2
+        elif name == f"{main_type}/*":
+            rank = 1
+        elif name == "*/*":
+            rank = 0
+        else:
+            continue
+        if rank < best_rank:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        best_q, best_rank = q, rank
+    return best_q, best_rank
+
+
+def _wants_binary(accept: Optional[str]) -> bool:
+    """
+    Whether the client prefers raw float32 samples over JSON.
+    
+    JSON stays the default: binary is chosen only when application/octet-stream
+    has a non-zero q-value above JSON's, or ties with it and is named explicitly
+    (so `*/*` alone still gets JSON).
+    """
+    if not accept:
+        return False
+    binary_q, binary_rank = _accept_quality(accept, "application/octet-stream")
+    json_q, _ = _accept_quality(accept, "application/json")
+    if binary_q <= 0:
+        return False
+    return binary_q > json_q or (binary_q == json_q and binary_rank == 2)
+
+
 @router.post("/synthetic", response_model=APIResponse)
-async def generate_synthetic_eeg(request: SyntheticEEGRequest):
+async def generate_synthetic_eeg(request: SyntheticEEGRequest,
+                                 accept: Optional[str] = Header(None)):
     """
     Generate synthetic EEG data for testing.
     
     Useful for frontend integration and demos without real BCI hardware.
+    
+    Clients whose Accept header prefers `application/octet-stream` (q-values
+    are honoured) get the samples as raw little-endian float32 bytes
+    (channel-major) with metadata in X-* headers, which is ~4x smaller than
+    the JSON payload and skips float formatting.
     """
     try:
-        # Generate synthetic EEG
-        synthetic_data = eeg_generator.generate(
-            duration=request.duration,
-            brain_state=request.brain_state
+        # Generate synthetic EEG (as one array, so no per-sample Python floats)
+        channel_names, samples = await anyio.to_thread.run_sync(
+            eeg_generator.generate,
+            request.duration,
+            request.brain_state,
+            True
         )
         
-        return APIResponse(
-            success=True,
-            message=f"Generated {request.duration}s of synthetic EEG ({request.brain_state} state)",
-            data={
-                "channels": synthetic_data,
+        if _wants_binary(accept):
+            samples = samples.astype('<f4', copy=False)
+            return Response(
+                content=samples.tobytes(),
+                media_type="application/octet-stream",
+                headers={
+                    "X-Sampling-Rate": str(eeg_generator.sampling_rate),
+                    "X-Num-Channels": str(samples.shape[0]),
+                    "X-Num-Samples": str(samples.shape[1]),
+                    "X-Channel-Names": ",".join(channel_names),
+                    "X-Brain-State": request.brain_state
+                }
+            )
+        
+        # orjson serializes the sample rows straight from the array; returning
+        # the response directly skips re-validating them as float lists
+        return Response(content=orjson.dumps({
+            "success": True,
+            "message": f"Generated {request.duration}s of synthetic EEG ({request.brain_state} state)",
+            "data": {
+                "channels": dict(zip(channel_names, samples)),
                 "sampling_rate": request.sampling_rate,
                 "num_channels": request.num_channels,
                 "brain_state": request.brain_state,
                 "duration": request.duration
-            }
-        )
+            },
+            "timestamp": datetime.now()
+        }, option=orjson.OPT_SERIALIZE_NUMPY), media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"EEG generation failed: {str(e)}")
@@ -127,29 +284,8 @@ async def get_frequency_bands_info(channel_count: int):
         success=True,
         message="EEG frequency band information",
         data={
-            "bands": {
-                "delta": {
-                    "range": "0.5-4 Hz",
-                    "description": "Deep sleep, unconscious processes"
-                },
-                "theta": {
-                    "range": "4-8 Hz",
-                    "description": "Drowsiness, meditation, memory, emotion"
-                },
-                "alpha": {
-                    "range": "8-13 Hz",
-                    "description": "Relaxation, calm, closed eyes"
-                },
-                "beta": {
-                    "range": "13-30 Hz",
-                    "description": "Active thinking, focus, motor planning"
-                },
-                "gamma": {
-                    "range": "30-100 Hz",
-                    "description": "High-level cognition, perception, consciousness"
-                }
-            },
+            "bands": _FREQUENCY_BANDS_INFO,
             "recommended_channels": max(8, min(channel_count, 32)),
-            "sampling_rate": settings.SAMPLING_RATE
+            "sampling_rate": _SAMPLING_RATE
         }
     )
@@ -3,33 +3,66 @@ Threat Detection API Routes.
 Endpoints for monitoring security threats.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from typing import List
-from datetime import datetime, timedelta
+from datetime import timedelta
+from itertools import islice
 
 from app.models.schemas import ThreatAlert, ThreatLevel, APIResponse
-from app.core.ai_firewall import threat_detector
+from app.core.ai_firewall import threat_detector, entry_time
 
 router = APIRouter()
 
+# Static payload for the educational /types endpoint, built once at import
+_THREAT_TYPES_INFO = {
+    "threats": {
+        "excessive_permissions": {
+            "description": "App requesting more data than needed",
+            "severity": "high",
+            "mitigation": "Deny full_spectrum permission, grant minimal access"
+        },
+        "data_harvesting": {
+            "description": "Unusually high request frequency",
+            "severity": "medium",
+            "mitigation": "Rate limiting, suspicious app flagging"
+        },
+        "emotional_surveillance": {
+            "description": "Accessing emotional data without justification",
+            "severity": "critical",
+            "mitigation": "Block emotional_state permission, alert user"
+        },
+        "brain_jacking": {
+            "description": "Attempting to inject malicious neural patterns",
+            "severity": "critical",
+            "mitigation": "Immediate connection termination, quarantine app"
+        }
+    }
+}
+
 
 @router.get("/recent", response_model=List[ThreatAlert])
-async def get_recent_threats(limit: int = 20):
+async def get_recent_threats(limit: int = Query(20, ge=1)):
     """
     Get recent threat detections.
     """
-    recent = threat_detector.threat_log[-limit:]
+    # Walk the bounded log from the newest end so only `limit` entries are touched
+    recent = reversed(list(islice(reversed(threat_detector.threat_log), limit)))
     
     threat_list = []
     for threat in recent:
+        try:
+            level = ThreatLevel._value2member_map_[threat['level']]
+        except KeyError:
+            level = ThreatLevel(threat['level'])
+        
         threat_list.append(
             ThreatAlert(
                 threat_id=threat['threat_id'],
                 threat_type=threat['threat_type'],
-                level=ThreatLevel(threat['level']),
+                level=level,
                 description=threat['description'],
                 app_id=threat.get('app_id'),
-                timestamp=datetime.fromisoformat(threat['timestamp']),
+                timestamp=entry_time(threat),
                 mitigated=threat['mitigated']
             )
         )
@@ -42,32 +75,24 @@ async def get_threat_statistics():
     """
     Get aggregated threat statistics.
     """
-    total_threats = len(threat_detector.threat_log)
-    
-    # Count by level
-    level_counts = {'low': 0, 'medium': 0, 'high': 0, 'critical': 0}
-    type_counts = {}
-    
-    for threat in threat_detector.threat_log:
-        level_counts[threat['level']] += 1
-        threat_type = threat['threat_type']
-        type_counts[threat_type] = type_counts.get(threat_type, 0) + 1
+    # Counts are maintained incrementally by the detector and cover all
+    # detections, including those already rotated out of the bounded log
+    level_counts = dict(threat_detector.level_counts)
+    total_threats = sum(level_counts.values())
+    type_counts = dict(threat_detector.type_counts)
     
     # Recent threats (last 24 hours)
-    recent_24h = [
-        t for t in threat_detector.threat_log
-        if datetime.fromisoformat(t['timestamp']) > datetime.now() - timedelta(hours=24)
-    ]
+    recent_24h_count = threat_detector.count_recent(timedelta(hours=24))
     
     return APIResponse(
         success=True,
         message="Threat statistics",
         data={
             "total_threats": total_threats,
-            "threats_24h": len(recent_24h),
+            "threats_24h": recent_24h_count,
             "by_level": level_counts,
             "by_type": type_counts,
-            "most_common_threat": max(type_counts.items(), key=lambda x: x[1])[0] if type_counts else "None"
+            "most_common_threat": threat_detector.most_common_threat or "None"
         }
     )
 
@@ -81,30 +106,7 @@ async def get_threat_types():
     return APIResponse(
         success=True,
         message="Known threat types",
-        data={
-            "threats": {
-                "excessive_permissions": {
-                    "description": "App requesting more data than needed",
-                    "severity": "high",
-                    "mitigation": "Deny full_spectrum permission, grant minimal access"
-                },
-                "data_harvesting": {
-                    "description": "Unusually high request frequency",
-                    "severity": "medium",
-                    "mitigation": "Rate limiting, suspicious app flagging"
-                },
-                "emotional_surveillance": {
-                    "description": "Accessing emotional data without justification",
-                    "severity": "critical",
-                    "mitigation": "Block emotional_state permission, alert user"
-                },
-                "brain_jacking": {
-                    "description": "Attempting to inject malicious neural patterns",
-                    "severity": "critical",
-                    "mitigation": "Immediate connection termination, quarantine app"
-                }
-            }
-        }
+        data=_THREAT_TYPES_INFO
     )
 
 
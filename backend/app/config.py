@@ -20,6 +20,7 @@ class Settings(BaseSettings):
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    THREAD_LIMITER_TOKENS: int = 200  # Max worker threads for blocking work
     
     # CORS
     FRONTEND_URL: str = "http://localhost:5500,http://127.0.0.1:5500"
@@ -46,6 +47,7 @@ class Settings(BaseSettings):
     # ML Models
     MODEL_PATH: str = "./ml_models"
     INTENT_MODEL_FILE: str = "intent_classifier.pkl"
+    USE_SKLEARNEX: bool = False  # Patch scikit-learn with Intel oneDAL at startup
     
     @property
     def intent_model_path(self) -> str:
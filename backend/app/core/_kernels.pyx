@@ -0,0 +1,42 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Ahead-of-time compiled kernels for the AI firewall.
+
+Optional: build in place with `cythonize -i app/core/_kernels.pyx`. When the
+extension is built, ai_firewall uses it instead of the numba kernel, so the
+first request doesn't pay for JIT compilation. Without it, the numba (or
+plain Python) version is used.
+"""
+
+
+cdef inline int _score(double theta, double alpha, double beta, double gamma,
+                       int* reasons) nogil:
+    """Rule score for one window; writes the fired-rule bit mask to `reasons`."""
+    cdef double beta_alpha_ratio = beta / (alpha + 1e-10)
+    cdef double theta_alpha_ratio = theta / (alpha + 1e-10)
+
+    # Same rules, weights and bit order as ai_firewall._score_intent
+    cdef int strong_beta = beta > 15
+    cdef int engaged = beta_alpha_ratio > 1.5
+    cdef int moderate_gamma = (gamma > 10) & (gamma < 30)
+    cdef int high_theta = theta > 20
+    cdef int high_gamma = gamma > 40
+    cdef int drowsy = theta_alpha_ratio > 1.0
+    cdef int low_beta = beta < 10
+
+    reasons[0] = (strong_beta | engaged << 1 | moderate_gamma << 2
+                  | high_theta << 3 | high_gamma << 4 | drowsy << 5 | low_beta << 6)
+    return (2 * strong_beta + engaged + moderate_gamma
+            - 2 * high_theta - 2 * high_gamma - drowsy - low_beta)
+
+
+def score_intent(double delta, double theta, double alpha, double beta, double gamma):
+    """
+    Compiled equivalent of ai_firewall._score_intent.
+
+    Returns:
+        Tuple of (score, reason_mask)
+    """
+    cdef int reasons = 0
+    cdef int score = _score(theta, alpha, beta, gamma, &reasons)
+    return score, reasons
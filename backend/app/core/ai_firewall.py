@@ -9,9 +9,107 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 import joblib
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from bisect import bisect_right
+from collections import Counter, deque
+import itertools
+import time
 import uuid
 
+from app.utils.jit import njit
+
+
+# Reasons reported by the rule-based classifier, indexed by bit in the
+# reason mask returned from _score_intent (in rule evaluation order)
+_RULE_REASONS = (
+    "strong beta (focus)",
+    "high beta/alpha ratio",
+    "controlled gamma",
+    "elevated theta (emotional)",
+    "high gamma (stress)",
+    "high theta/alpha",
+    "low beta",
+)
+
+
+@njit(cache=True, fastmath=True)
+def _score_intent(delta, theta, alpha, beta, gamma):
+    """
+    Numeric core of the rule-based classifier.
+    
+    Returns:
+        Tuple of (score, reason_mask); bit i of reason_mask is set when
+        rule _RULE_REASONS[i] fired
+    """
+    # Calculate ratios
+    beta_alpha_ratio = beta / (alpha + 1e-10)
+    theta_alpha_ratio = theta / (alpha + 1e-10)
+    
+    # Each rule is 0/1, so score and mask are straight-line arithmetic
+    # (no branches); _score_intents applies the same rules to whole batches
+    
+    # Intentional markers (positive score)
+    strong_beta = int(beta > 15)  # Strong beta indicates focus
+    engaged = int(beta_alpha_ratio > 1.5)  # High beta/alpha suggests engagement
+    moderate_gamma = int((gamma > 10) & (gamma < 30))  # Moderate gamma is good
+    
+    # Subconscious markers (negative score)
+    high_theta = int(theta > 20)  # High theta suggests emotion/memory
+    high_gamma = int(gamma > 40)  # Very high gamma indicates stress
+    drowsy = int(theta_alpha_ratio > 1.0)  # Drowsiness or emotional state
+    low_beta = int(beta < 10)  # Low beta = lack of intentional focus
+    
+    score = (2 * strong_beta + engaged + moderate_gamma
+             - 2 * high_theta - 2 * high_gamma - drowsy - low_beta)
+    reasons = (strong_beta | engaged << 1 | moderate_gamma << 2
+               | high_theta << 3 | high_gamma << 4 | drowsy << 5 | low_beta << 6)
+    
+    return score, reasons
+
+
+try:
+    # Ahead-of-time compiled kernel (no JIT warm-up), if the extension was built
+    from app.core._kernels import score_intent as _score_intent
+except ImportError:
+    pass
+
+
+def _score_intents(X: np.ndarray) -> np.ndarray:
+    """Vectorized _score_intent scores for a (n_windows, n_features) matrix."""
+    # Ratios in float64, like the per-window rules, whatever the matrix dtype
+    delta, theta, alpha, beta, gamma = X[:, :5].T.astype(np.float64, copy=False)
+    beta_alpha_ratio = beta / (alpha + 1e-10)
+    theta_alpha_ratio = theta / (alpha + 1e-10)
+    
+    score = 2 * (beta > 15).astype(np.int64)
+    score += beta_alpha_ratio > 1.5
+    score += (gamma > 10) & (gamma < 30)
+    score -= 2 * (theta > 20)
+    score -= 2 * (gamma > 40)
+    score -= theta_alpha_ratio > 1.0
+    score -= beta < 10
+    return score
+
+
+def _first_reasons(reason_mask: int, count: int = 2) -> List[str]:
+    """Reason strings for the first `count` rules set in reason_mask."""
+    reasons = []
+    for i, reason in enumerate(_RULE_REASONS):
+        if reason_mask >> i & 1:
+            reasons.append(reason)
+            if len(reasons) == count:
+                break
+    return reasons
+
+
+# Intent labels indexed by the codes returned from classify_batch
+INTENT_LABELS = ('intentional', 'subconscious', 'neutral')
+_NEUTRAL_CODE = 2
+
+# Model input order for the ML classifier
+_FEATURE_NAMES = ('delta', 'theta', 'alpha', 'beta', 'gamma',
+                  'beta_alpha_ratio', 'gamma_beta_ratio')
+
 
 class IntentClassifier:
     """
@@ -28,8 +126,11 @@ class IntentClassifier:
             model_path: Path to pre-trained model (None = use rule-based)
         """
         self.model = None
+        self.fil = None  # Optional nvForest (FIL) copy of the forest for fast inference
         self.scaler = StandardScaler()
         self.model_path = model_path
+        # Feature row reused by classify(), which only runs on the event loop
+        self._feature_row = np.empty((1, len(_FEATURE_NAMES)), dtype=np.float32)
         
         # Try to load pre-trained model
         if model_path and os.path.exists(model_path):
@@ -38,6 +139,34 @@ class IntentClassifier:
                 print(f"Loaded intent classifier from {model_path}")
             except Exception as e:
                 print(f"Could not load model: {e}, using rule-based classification")
+        
+        if self.model is not None:
+            self.fil = self._load_fil(self.model)
+    
+    @staticmethod
+    def _load_fil(model):
+        """
+        Compile the forest with nvForest if it's installed.
+        
+        FIL stores the trees in a contiguous depth-first layout and traverses
+        them in native code (GPU when available, CPU otherwise), avoiding
+        scikit-learn's per-tree Python dispatch on small batches.
+        """
+        try:
+            import nvforest
+        except ImportError:
+            return None
+        
+        try:
+            # Feature vectors are float32, so keep the trees in single precision too
+            fil = nvforest.load_from_sklearn(model, device="auto", layout="depth_first",
+                                             precision="single")
+            fil.optimize(batch_size=1)
+            print("Using nvForest inference for intent classifier")
+            return fil
+        except Exception as e:
+            print(f"Could not load nvForest model: {e}, using scikit-learn inference")
+            return None
     
     def classify(self, features: Dict[str, float]) -> Tuple[str, float, str]:
         """
@@ -71,59 +200,24 @@ class IntentClassifier:
         - High Gamma (anxiety, stress)
         - Low Beta (lack of focus)
         """
-        beta = features.get('beta', 0)
-        alpha = features.get('alpha', 0)
-        theta = features.get('theta', 0)
-        gamma = features.get('gamma', 0)
-        delta = features.get('delta', 0)
-        
-        # Calculate ratios
-        beta_alpha_ratio = beta / (alpha + 1e-10)
-        theta_alpha_ratio = theta / (alpha + 1e-10)
-        
-        # Decision logic
-        score = 0
-        reasons = []
-        
-        # Intentional markers (positive score)
-        if beta > 15:  # Strong beta indicates focus
-            score += 2
-            reasons.append("strong beta (focus)")
-        
-        if beta_alpha_ratio > 1.5:  # High beta/alpha suggests engagement
-            score += 1
-            reasons.append("high beta/alpha ratio")
-        
-        if gamma > 10 and gamma < 30:  # Moderate gamma is good
-            score += 1
-            reasons.append("controlled gamma")
-        
-        # Subconscious markers (negative score)
-        if theta > 20:  # High theta suggests emotion/memory
-            score -= 2
-            reasons.append("elevated theta (emotional)")
-        
-        if gamma > 40:  # Very high gamma indicates stress
-            score -= 2
-            reasons.append("high gamma (stress)")
-        
-        if theta_alpha_ratio > 1.0:  # Drowsiness or emotional state
-            score -= 1
-            reasons.append("high theta/alpha")
-        
-        if beta < 10:  # Low beta = lack of intentional focus
-            score -= 1
-            reasons.append("low beta")
+        score, reason_mask = _score_intent(
+            float(features.get('delta', 0)),
+            float(features.get('theta', 0)),
+            float(features.get('alpha', 0)),
+            float(features.get('beta', 0)),
+            float(features.get('gamma', 0))
+        )
+        reasons = _first_reasons(reason_mask)
         
         # Classification
         if score >= 2:
             intent = "intentional"
             confidence = min(0.9, 0.5 + score * 0.1)
-            explanation = f"Intentional command detected: {', '.join(reasons[:2])}"
+            explanation = f"Intentional command detected: {', '.join(reasons)}"
         elif score <= -2:
             intent = "subconscious"
             confidence = min(0.9, 0.5 + abs(score) * 0.1)
-            explanation = f"Subconscious activity detected: {', '.join(reasons[:2])}"
+            explanation = f"Subconscious activity detected: {', '.join(reasons)}"
         else:
             intent = "neutral"
             confidence = 0.6
@@ -131,31 +225,118 @@ class IntentClassifier:
         
         return intent, confidence, explanation
     
+    def warm_up(self):
+        """Compile the JIT scoring kernel so the first request doesn't pay for it."""
+        _score_intent(0.0, 0.0, 0.0, 0.0, 0.0)
+    
+    def classify_batch(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classify many feature windows at once.
+        
+        With a trained model all windows go through a single predict_proba
+        call; otherwise the rules are scored as array operations over the batch.
+        
+        Args:
+            X: Feature matrix, shape (n_windows, n_features) in
+               feature_matrix() column order
+            
+        Returns:
+            Tuple of (codes, confidences); codes index INTENT_LABELS
+        """
+        X = np.asarray(X)
+        if X.shape[0] == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        
+        if self.model is not None:
+            probabilities = self._predict_proba(X)
+            best = np.argmax(probabilities, axis=1)
+            predictions = self.model.classes_[best]
+            codes = np.where(np.isin(predictions, (0, 1, 2)), predictions, _NEUTRAL_CODE).astype(np.int64)
+            confidences = probabilities[np.arange(len(best)), best].astype(np.float64)
+            return codes, confidences
+        
+        # Same thresholds as _rule_based_classify
+        score = _score_intents(X)
+        codes = np.select([score >= 2, score <= -2], [0, 1], _NEUTRAL_CODE)
+        confidences = np.where(codes == _NEUTRAL_CODE, 0.6,
+                               np.minimum(0.9, 0.5 + np.abs(score) * 0.1))
+        return codes, confidences
+    
+    def feature_matrix(self, features_list: List[Dict[str, float]]) -> np.ndarray:
+        """Stack feature dicts into a (n_windows, n_features) float32 matrix for classify_batch."""
+        X = np.empty((len(features_list), len(_FEATURE_NAMES)), dtype=np.float32)
+        for i, features in enumerate(features_list):
+            self._extract_feature_vector(features, out=X[i:i + 1])
+        return X
+    
     def _ml_classify(self, features: Dict[str, float]) -> Tuple[str, float, str]:
         """ML-based classification using trained model."""
         # Extract feature vector
         feature_vector = self._extract_feature_vector(features)
         
-        # Predict
-        prediction = self.model.predict([feature_vector])[0]
-        probabilities = self.model.predict_proba([feature_vector])[0]
+        # Predict (one pass; the predicted class is the most probable one)
+        probabilities = self._predict_proba(feature_vector)[0]
+        
+        return self._interpret_probabilities(probabilities)
+    
+    def _predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (n_windows, n_features) matrix."""
+        if self.fil is not None:
+            return np.asarray(self.fil.predict_proba(X.astype(np.float32, copy=False)))
+        return self.model.predict_proba(X)
+    
+    def _interpret_probabilities(self, probabilities: np.ndarray) -> Tuple[str, float, str]:
+        """Turn one row of class probabilities into a classification result."""
+        best = int(np.argmax(probabilities))
+        prediction = self.model.classes_[best]
         
         intent_map = {0: 'intentional', 1: 'subconscious', 2: 'neutral'}
         intent = intent_map.get(prediction, 'neutral')
-        confidence = float(max(probabilities))
+        confidence = float(probabilities[best])
         
         explanation = f"ML model classified as {intent} with {confidence:.2%} confidence"
         
         return intent, confidence, explanation
     
-    def _extract_feature_vector(self, features: Dict[str, float]) -> np.ndarray:
-        """Convert feature dict to numpy array for ML model."""
-        # Standard feature order
-        feature_names = ['delta', 'theta', 'alpha', 'beta', 'gamma', 
-                        'beta_alpha_ratio', 'gamma_beta_ratio']
+    def _extract_feature_vector(self, features: Dict[str, float],
+                                out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Write the feature dict into a (1, n_features) float32 row for the ML model.
         
-        vector = [features.get(name, 0.0) for name in feature_names]
-        return np.array(vector)
+        Without `out`, the classifier's single preallocated row is reused, so
+        the result is only valid until the next call. Callers off the event
+        loop (e.g. feature_matrix in a worker thread) must pass their own `out`.
+        """
+        if out is None:
+            out = self._feature_row
+        
+        row = out[0]
+        for i, name in enumerate(_FEATURE_NAMES):
+            row[i] = features.get(name, 0.0)
+        return out
+
+
+def _filter_motor_intent(data: Dict[str, float], intent: str, filtered: Dict[str, float]):
+    filtered['motor_intent'] = 1.0 if intent == 'intentional' else 0.0
+    filtered['beta'] = data.get('beta', 0)
+
+
+def _filter_focus_level(data: Dict[str, float], intent: str, filtered: Dict[str, float]):
+    filtered['beta_alpha_ratio'] = data.get('beta_alpha_ratio', 0)
+
+
+def _filter_emotional_state(data: Dict[str, float], intent: str, filtered: Dict[str, float]):
+    filtered['theta'] = data.get('theta', 0)
+    filtered['alpha'] = data.get('alpha', 0)
+
+
+# Permission -> function copying the fields that permission exposes
+# ('full_spectrum' is handled separately since it exposes everything)
+_PERMISSION_FILTERS = {
+    'motor_intent': _filter_motor_intent,
+    'focus_level': _filter_focus_level,
+    'emotional_state': _filter_emotional_state,
+}
 
 
 class PermissionGate:
@@ -164,21 +345,31 @@ class PermissionGate:
     Controls what data apps can access based on user permissions.
     """
     
-    def __init__(self):
-        """Initialize permission gate."""
-        self.permissions = {}  # app_id -> list of granted permissions
-        self.audit_log = []
+    def __init__(self, audit_log_size: int = 10_000):
+        """
+        Initialize permission gate.
+        
+        Args:
+            audit_log_size: Max audit entries kept (oldest are dropped)
+        """
+        # app_id -> {'app_name': str, 'granted': dict of permission -> None}
+        # (a dict rather than a set so permissions stay in grant order)
+        self.permissions = {}
+        self.audit_log = deque(maxlen=audit_log_size)
+        self.version = 0  # bumped on every permission change, for cache keys
     
     def grant_permission(self, app_id: str, app_name: str, permission_type: str):
         """Grant a permission to an app."""
         if app_id not in self.permissions:
             self.permissions[app_id] = {
                 'app_name': app_name,
-                'granted': []
+                'granted': {}
             }
         
-        if permission_type not in self.permissions[app_id]['granted']:
-            self.permissions[app_id]['granted'].append(permission_type)
+        granted = self.permissions[app_id]['granted']
+        if permission_type not in granted:
+            granted[permission_type] = None
+            self.version += 1
             
             # Log the grant
             self.audit_log.append({
@@ -186,14 +377,16 @@ class PermissionGate:
                 'app_name': app_name,
                 'action': 'grant',
                 'permission': permission_type,
-                'timestamp': datetime.now().isoformat()
+                'timestamp_ns': time.time_ns()
             })
     
     def revoke_permission(self, app_id: str, permission_type: str):
         """Revoke a permission from an app."""
         if app_id in self.permissions:
-            if permission_type in self.permissions[app_id]['granted']:
-                self.permissions[app_id]['granted'].remove(permission_type)
+            granted = self.permissions[app_id]['granted']
+            if permission_type in granted:
+                del granted[permission_type]
+                self.version += 1
                 
                 # Log the revocation
                 self.audit_log.append({
@@ -201,14 +394,42 @@ class PermissionGate:
                     'app_name': self.permissions[app_id]['app_name'],
                     'action': 'revoke',
                     'permission': permission_type,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp_ns': time.time_ns()
                 })
     
+    def revoke_all(self, app_id: str) -> Optional[str]:
+        """
+        Revoke every permission from an app in one step.
+        
+        Returns:
+            The app's name, or None if the app is unknown
+        """
+        entry = self.permissions.get(app_id)
+        if entry is None:
+            return None
+        
+        app_name = entry['app_name']
+        granted = entry['granted']
+        if granted:
+            # Keep one audit row per permission so the trail matches single revokes
+            timestamp_ns = time.time_ns()
+            for permission_type in granted:
+                self.audit_log.append({
+                    'app_id': app_id,
+                    'app_name': app_name,
+                    'action': 'revoke',
+                    'permission': permission_type,
+                    'timestamp_ns': timestamp_ns
+                })
+            granted.clear()
+            self.version += 1
+        
+        return app_name
+    
     def check_permission(self, app_id: str, permission_type: str) -> bool:
         """Check if app has a specific permission."""
-        if app_id not in self.permissions:
-            return False
-        return permission_type in self.permissions[app_id]['granted']
+        entry = self.permissions.get(app_id)
+        return entry is not None and permission_type in entry['granted']
     
     def filter_data(self, 
                    app_id: str, 
@@ -230,33 +451,57 @@ class PermissionGate:
             return {'motor_intent': 1.0 if intent == 'intentional' else 0.0}
         
         granted = self.permissions[app_id]['granted']
-        filtered = {}
-        
-        # Permission-based filtering
-        if 'motor_intent' in granted:
-            filtered['motor_intent'] = 1.0 if intent == 'intentional' else 0.0
-            filtered['beta'] = data.get('beta', 0)
-        
-        if 'focus_level' in granted:
-            filtered['beta_alpha_ratio'] = data.get('beta_alpha_ratio', 0)
-        
-        if 'emotional_state' in granted:
-            filtered['theta'] = data.get('theta', 0)
-            filtered['alpha'] = data.get('alpha', 0)
         
         if 'full_spectrum' in granted:
             # Grant all data (dangerous!)
-            filtered = data.copy()
+            return data.copy()
+        
+        # Permission-based filtering, in table order so the output keys are stable
+        filtered = {}
+        for permission_type, copy_fields in _PERMISSION_FILTERS.items():
+            if permission_type in granted:
+                copy_fields(data, intent, filtered)
         
         return filtered
 
 
+def entry_time(entry: Dict) -> datetime:
+    """
+    Wall-clock time of an audit or threat log entry.
+    
+    Entries store `timestamp_ns` (from time.time_ns()) when logged; the
+    datetime is only built when an entry is read out.
+    """
+    return datetime.fromtimestamp(entry['timestamp_ns'] / 1e9)
+
+
+# Random per-process prefix for threat IDs, so IDs stay unique across restarts
+_BOOT_ID = uuid.uuid4().hex[:12]
+
+
 class ThreatDetector:
     """Detect malicious patterns in neural data requests."""
     
-    def __init__(self):
-        """Initialize threat detector."""
-        self.threat_log = []
+    def __init__(self,
+                 threat_log_size: int = 10_000,
+                 recent_window: timedelta = timedelta(hours=24)):
+        """
+        Initialize threat detector.
+        
+        Args:
+            threat_log_size: Max threat entries kept (oldest are dropped)
+            recent_window: How long detection times are kept for count_recent
+        """
+        self.threat_log = deque(maxlen=threat_log_size)
+        
+        # Running aggregates so statistics don't rescan the whole log
+        self.level_counts = Counter({'low': 0, 'medium': 0, 'high': 0, 'critical': 0})
+        self.type_counts = Counter()
+        self.most_common_threat = None  # threat type with the highest count
+        self._most_common_count = 0
+        self._recent_times = deque()  # detection times (ns), oldest first
+        self._recent_window_ns = int(recent_window.total_seconds() * 1e9)
+        self._threat_ids = itertools.count(1)
     
     def detect_threats(self,
                       app_id: str,
@@ -278,7 +523,7 @@ class ThreatDetector:
         # Threat 1: Requesting full spectrum without justification
         if 'full_spectrum' in requested_permissions:
             threats.append({
-                'threat_id': str(uuid.uuid4()),
+                'threat_id': self._next_threat_id(),
                 'threat_type': 'excessive_permissions',
                 'level': 'high',
                 'description': f'App {app_id} requesting full neural spectrum access',
@@ -289,7 +534,7 @@ class ThreatDetector:
         # Threat 2: High request frequency (data harvesting)
         if request_frequency > 10:
             threats.append({
-                'threat_id': str(uuid.uuid4()),
+                'threat_id': self._next_threat_id(),
                 'threat_type': 'data_harvesting',
                 'level': 'medium',
                 'description': f'Unusual request frequency: {request_frequency}/sec',
@@ -300,7 +545,7 @@ class ThreatDetector:
         # Threat 3: Emotional data without motor intent permission
         if 'emotional_state' in requested_permissions and 'motor_intent' not in requested_permissions:
             threats.append({
-                'threat_id': str(uuid.uuid4()),
+                'threat_id': self._next_threat_id(),
                 'threat_type': 'emotional_surveillance',
                 'level': 'critical',
                 'description': 'App requesting emotional data without primary functionality need',
@@ -308,12 +553,53 @@ class ThreatDetector:
                 'mitigated': False
             })
         
-        # Log all threats
+        # Log all threats (raw ns timestamp; formatted only when read out)
+        now = time.time_ns()
         for threat in threats:
-            threat['timestamp'] = datetime.now().isoformat()
+            threat['timestamp_ns'] = now
             self.threat_log.append(threat)
+            self.level_counts[threat['level']] += 1
+            self._count_threat_type(threat['threat_type'])
+            self._recent_times.append(now)
+        if threats:
+            # Drop times that fell out of the window, so the queue stays
+            # bounded even if nobody reads the statistics
+            self._prune_recent(now - self._recent_window_ns)
         
         return threats
+    
+    def _next_threat_id(self) -> str:
+        """Unique threat ID: per-process random prefix plus a sequence number."""
+        return f'{_BOOT_ID}-{next(self._threat_ids):08x}'
+    
+    def _count_threat_type(self, threat_type: str):
+        """Increment a threat type count and keep the running leader current."""
+        count = self.type_counts[threat_type] + 1
+        self.type_counts[threat_type] = count
+        if count > self._most_common_count:
+            self.most_common_threat = threat_type
+            self._most_common_count = count
+    
+    def count_recent(self, window: timedelta) -> int:
+        """
+        Count threats detected within the given time window.
+        
+        Detection times are only kept for `recent_window`, so longer
+        windows are capped at it.
+        """
+        now = time.time_ns()
+        self._prune_recent(now - self._recent_window_ns)
+        cutoff = now - int(window.total_seconds() * 1e9)
+        recent = self._recent_times
+        if not recent or recent[0] > cutoff:
+            return len(recent)
+        return len(recent) - bisect_right(recent, cutoff)
+    
+    def _prune_recent(self, cutoff: int):
+        """Drop detection times at or before `cutoff` (ns) from the front of the queue."""
+        recent = self._recent_times
+        while recent and recent[0] <= cutoff:
+            recent.popleft()
 
 
 # Global instances (in real app, use dependency injection)
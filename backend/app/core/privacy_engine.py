@@ -3,9 +3,104 @@ Differential Privacy Engine for Neural Data Protection.
 Implements Laplacian noise mechanism for privacy preservation.
 """
 
+import threading
 import numpy as np
-from typing import Dict, Any
-import copy
+from typing import Dict, Any, Optional
+
+
+class NoiseRing:
+    """
+    Ring buffer of unit Laplace samples refilled by a background thread.
+    
+    The buffer is split in two halves: requests read from one while the
+    producer thread refills the other, which keeps RNG work off the request
+    path. Each sample is handed out at most once; if requests outrun the
+    producer, the next half is refilled synchronously.
+    """
+    
+    def __init__(self, rng: Optional[np.random.Generator] = None, size: int = 1 << 16):
+        """
+        Initialize noise ring.
+        
+        Args:
+            rng: Generator to draw from (None = new SFC64 generator)
+            size: Total samples buffered across both halves
+        """
+        self._rng = rng if rng is not None else np.random.Generator(np.random.SFC64())
+        self._half = max(1, size // 2)
+        self.buf = self._rng.laplace(0.0, 1.0, 2 * self._half)
+        self._fresh = [True, True]  # whether each half holds unread samples
+        self._idx = 0
+        self._lock = threading.Lock()
+        self._stale = threading.Condition(self._lock)
+        
+        self._producer = threading.Thread(target=self._refill_loop, name='noise-ring', daemon=True)
+        self._producer.start()
+    
+    def take(self, k: int) -> np.ndarray:
+        """Return `k` unit Laplace samples as a new array."""
+        if k > self._half:
+            return self._rng.laplace(0.0, 1.0, k)
+        
+        with self._lock:
+            start = self._idx
+            half = start // self._half
+            if start + k > (half + 1) * self._half:
+                # Not enough left in this half: drop the rest and switch halves
+                self._retire(half)
+                half ^= 1
+                start = half * self._half
+            if not self._fresh[half]:
+                self._fill(half)  # producer fell behind
+            
+            end = start + k
+            out = self.buf[start:end].copy()
+            if end == (half + 1) * self._half:
+                self._retire(half)
+                end %= self.buf.size
+            self._idx = end
+        return out
+    
+    def _retire(self, half: int):
+        """Mark a half as used up and wake the producer (lock held)."""
+        self._fresh[half] = False
+        self._stale.notify()
+    
+    def _fill(self, half: int):
+        """Refill a half in place (lock held)."""
+        self.buf[half * self._half:(half + 1) * self._half] = self._rng.laplace(0.0, 1.0, self._half)
+        self._fresh[half] = True
+    
+    def _refill_loop(self):
+        """Producer thread: refill halves as requests retire them."""
+        while True:
+            with self._stale:
+                self._stale.wait_for(lambda: not all(self._fresh))
+                half = self._fresh.index(False)
+            
+            # Draw outside the lock so requests keep reading the other half
+            samples = self._rng.laplace(0.0, 1.0, self._half)
+            with self._lock:
+                if not self._fresh[half]:
+                    self.buf[half * self._half:(half + 1) * self._half] = samples
+                    self._fresh[half] = True
+
+
+# Field values that apply_privacy adds noise to
+_NUMERIC_TYPES = (int, float)
+
+_shared_ring: Optional[NoiseRing] = None
+_shared_ring_lock = threading.Lock()
+
+
+def shared_noise_ring() -> NoiseRing:
+    """Process-wide noise ring, created (with its producer thread) on first use."""
+    global _shared_ring
+    if _shared_ring is None:
+        with _shared_ring_lock:
+            if _shared_ring is None:
+                _shared_ring = NoiseRing()
+    return _shared_ring
 
 
 class PrivacyEngine:
@@ -16,16 +111,29 @@ class PrivacyEngine:
     
     def __init__(self, 
                  epsilon: float = 1.0,
-                 delta: float = 1e-5):
+                 delta: float = 1e-5,
+                 noise_ring: Optional[NoiseRing] = None):
         """
         Initialize privacy engine.
         
         Args:
             epsilon: Privacy budget (lower = more privacy, less utility)
             delta: Probability of privacy breach (typically ~1e-5)
+            noise_ring: Source of Laplace samples (None = shared process-wide ring)
         """
         self.epsilon = epsilon
         self.delta = delta
+        self._noise = noise_ring if noise_ring is not None else shared_noise_ring()
+    
+    @staticmethod
+    def _copy_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy a data dict so fields can be overwritten without touching the caller's.
+        
+        Values are normally scalars, so a shallow copy is enough; nested dicts
+        are copied one level down instead of paying for a full deepcopy.
+        """
+        return {k: (v.copy() if isinstance(v, dict) else v) for k, v in data.items()}
     
     def add_laplacian_noise(self, 
                            value: float,
@@ -41,7 +149,7 @@ class PrivacyEngine:
             Noisy value
         """
         scale = sensitivity / self.epsilon
-        noise = np.random.laplace(0, scale)
+        noise = float(self._noise.take(1)[0]) * scale
         return value + noise
     
     def privatize_frequency_bands(self,
@@ -61,16 +169,16 @@ class PrivacyEngine:
         # Lower privacy_level = more noise
         effective_epsilon = self.epsilon * (privacy_level + 0.1)
         
-        privatized = {}
-        for band_name, power in bands.items():
-            # Add noise scaled by current epsilon
-            scale = 1.0 / effective_epsilon
-            noise = np.random.laplace(0, scale)
-            
-            # Ensure non-negative power values
-            privatized[band_name] = max(0.0, power + noise)
+        # Draw noise for all bands in one call, scaled by current epsilon
+        band_names = list(bands)
+        powers = np.fromiter(bands.values(), dtype=np.float64, count=len(band_names))
+        noise = self._noise.take(powers.size)
+        noise *= 1.0 / effective_epsilon
+        
+        # Ensure non-negative power values
+        privatized = np.maximum(0.0, powers + noise)
         
-        return privatized
+        return dict(zip(band_names, privatized.tolist()))
     
     def apply_privacy(self,
                      data: Dict[str, Any],
@@ -87,20 +195,23 @@ class PrivacyEngine:
         Returns:
             Privacy-protected data
         """
-        protected_data = copy.deepcopy(data)
+        protected_data = self._copy_fields(data)
         
-        # If no fields specified, protect all numeric fields
+        # Numeric fields to protect (all numeric fields if none specified),
+        # found in a single pass
         if protect_fields is None:
-            protect_fields = [k for k, v in data.items() if isinstance(v, (int, float))]
+            fields = [k for k, v in data.items() if isinstance(v, _NUMERIC_TYPES)]
+        else:
+            fields = [f for f in protect_fields if isinstance(data.get(f), _NUMERIC_TYPES)]
         
         # Adjust epsilon based on privacy level
         effective_epsilon = self.epsilon * (privacy_level + 0.1)
         
-        for field in protect_fields:
-            if field in protected_data and isinstance(protected_data[field], (int, float)):
-                scale = 1.0 / effective_epsilon
-                noise = np.random.laplace(0, scale)
-                protected_data[field] = protected_data[field] + noise
+        if fields:
+            # One noise draw for all protected fields
+            values = np.fromiter((protected_data[f] for f in fields), dtype=np.float64, count=len(fields))
+            noisy = values + self._noise.take(len(fields)) * (1.0 / effective_epsilon)
+            protected_data.update(zip(fields, noisy.tolist()))
         
         return protected_data
     
@@ -117,7 +228,7 @@ class PrivacyEngine:
         Returns:
             Masked data
         """
-        masked_data = copy.deepcopy(data)
+        masked_data = self._copy_fields(data)
         
         # Define sensitive fields (those revealing subconscious state)
         # These are typically emotional/memory indicators
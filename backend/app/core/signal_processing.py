@@ -3,13 +3,277 @@ Signal Processing Pipeline for EEG Data.
 Handles noise removal, artifact filtering, and frequency decomposition.
 """
 
+import threading
+from functools import lru_cache
 import numpy as np
 from scipy import signal
-from scipy.fft import fft, fftfreq
-from typing import Dict, List, Tuple
-import mne
-from mne import create_info
-from mne.io import RawArray
+from scipy.fft import rfftfreq
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from app.utils.jit import njit, NUMBA_AVAILABLE
+
+
+class EEGBuffer:
+    """
+    Multi-channel EEG window stored as one (n_channels, n_samples) float32 array.
+    
+    Channel names are kept in a parallel list; the dict-of-lists form is only
+    needed at the API boundary.
+    """
+    
+    __slots__ = ('names', 'data')
+    
+    def __init__(self, names: List[str], data: np.ndarray):
+        """
+        Args:
+            names: Channel names, one per row of `data`
+            data: Samples, shape (n_channels, n_samples)
+        """
+        self.names = names
+        self.data = data
+    
+    @classmethod
+    def from_channels(cls, channels: Dict[str, List[float]]) -> 'EEGBuffer':
+        """Stack a channel-name -> samples mapping into a float32 buffer (channels must be equal length)."""
+        names = list(channels)
+        if not names:
+            return cls(names, np.empty((0, 0), dtype=np.float32))
+        return cls(names, np.asarray([channels[ch] for ch in names], dtype=np.float32))
+    
+    def to_channels(self) -> Dict[str, List[float]]:
+        """Convert back to the channel-name -> samples mapping used by the API."""
+        return dict(zip(self.names, self.data.tolist()))
+    
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+# Pipeline inputs may be a buffer or the raw API mapping
+EEGInput = Union[EEGBuffer, Dict[str, List[float]]]
+
+
+def _as_buffer(channels: EEGInput) -> EEGBuffer:
+    """Wrap raw channel data in an EEGBuffer (no-op for buffers)."""
+    if isinstance(channels, EEGBuffer):
+        return channels
+    return EEGBuffer.from_channels(channels)
+
+
+@njit(cache=True, fastmath=True)
+def _amplitude_stats_kernel(data):
+    """Mean absolute value and standard deviation of a 2-D array in one pass."""
+    n_rows, n_cols = data.shape
+    n = n_rows * n_cols
+    if n == 0:
+        return np.nan, np.nan
+    
+    # Sums are taken around the first sample to keep the variance stable
+    shift = data[0, 0]
+    abs_sum = 0.0
+    dev_sum = 0.0
+    dev_sq_sum = 0.0
+    for i in range(n_rows):
+        for j in range(n_cols):
+            x = data[i, j]
+            abs_sum += abs(x)
+            d = x - shift
+            dev_sum += d
+            dev_sq_sum += d * d
+    
+    mean_dev = dev_sum / n
+    variance = max(dev_sq_sum / n - mean_dev * mean_dev, 0.0)
+    return abs_sum / n, np.sqrt(variance)
+
+
+def _amplitude_stats(data: np.ndarray) -> Tuple[float, float]:
+    """Mean absolute amplitude and amplitude standard deviation over all samples."""
+    if NUMBA_AVAILABLE:
+        mean_abs, std = _amplitude_stats_kernel(data)
+        return float(mean_abs), float(std)
+    # Without the JIT a Python loop would be far slower than two NumPy passes
+    return float(np.mean(np.abs(data))), float(np.std(data))
+
+
+class FeatureContext:
+    """
+    Shared intermediate results for feature extraction on one EEG window.
+    
+    The power spectrum and band powers are computed on first use and then
+    reused, so any number of spectral features cost a single FFT.
+    """
+    
+    __slots__ = ('buffer', 'processor', '_power', '_band_powers', '_amplitude')
+    
+    def __init__(self, buffer: EEGBuffer, processor: 'SignalProcessor'):
+        self.buffer = buffer
+        self.processor = processor
+        self._power: Optional[np.ndarray] = None
+        self._band_powers: Optional[Dict[str, float]] = None
+        self._amplitude: Optional[Tuple[float, float]] = None
+    
+    @property
+    def data(self) -> np.ndarray:
+        """Time-domain samples, shape (n_channels, n_samples)."""
+        return self.buffer.data
+    
+    @property
+    def power(self) -> np.ndarray:
+        """
+        Power spectrum per channel, shape (n_channels, n_samples // 2 + 1).
+        
+        The array is scratch space owned by the calling thread; it is only
+        valid until that thread processes its next window.
+        """
+        if self._power is None:
+            self._compute_spectrum()
+        return self._power
+    
+    @property
+    def band_powers(self) -> Dict[str, float]:
+        """Average power per frequency band across channels."""
+        if self._band_powers is None:
+            if len(self.buffer):
+                self._compute_spectrum()
+            else:
+                self._band_powers = {band: 0.0 for band in self.processor.bands}
+        return self._band_powers
+    
+    @property
+    def amplitude_stats(self) -> Tuple[float, float]:
+        """(mean absolute amplitude, amplitude std) over all channels."""
+        if self._amplitude is None:
+            self._amplitude = _amplitude_stats(self.data)
+        return self._amplitude
+    
+    def _compute_spectrum(self):
+        spectrum = self.processor._spectrum_for(self.data)
+        self._power, self._band_powers = spectrum(self.data)
+
+
+# Feature name -> function computing it from a FeatureContext (in output order)
+FEATURES: Dict[str, Callable[[FeatureContext], float]] = {}
+
+
+def feature(name: str):
+    """Register a feature computed by compute_features from a FeatureContext."""
+    def decorator(func: Callable[[FeatureContext], float]):
+        FEATURES[name] = func
+        return func
+    return decorator
+
+
+@feature('mean_amplitude')
+def _mean_amplitude(ctx: FeatureContext) -> float:
+    return ctx.amplitude_stats[0]
+
+
+@feature('std_amplitude')
+def _std_amplitude(ctx: FeatureContext) -> float:
+    return ctx.amplitude_stats[1]
+
+
+@feature('beta_alpha_ratio')
+def _beta_alpha_ratio(ctx: FeatureContext) -> float:
+    bands = ctx.band_powers
+    return bands['beta'] / (bands['alpha'] + 1e-10)
+
+
+@feature('gamma_beta_ratio')
+def _gamma_beta_ratio(ctx: FeatureContext) -> float:
+    bands = ctx.band_powers
+    return bands['gamma'] / (bands['beta'] + 1e-10)
+
+
+@feature('num_channels')
+def _num_channels(ctx: FeatureContext) -> int:
+    return len(ctx.buffer)
+
+
+@lru_cache(maxsize=8)
+def _make_spectrum(n_channels: int,
+                   n_samples: int,
+                   sampling_rate: int,
+                   bands: Tuple[Tuple[str, float, float], ...],
+                   dtype: np.dtype = np.dtype(np.float32)
+                   ) -> Callable[[np.ndarray], Tuple[np.ndarray, Dict[str, float]]]:
+    """
+    Build a power spectrum + band power function for one window layout.
+    
+    A headset streams the same channel count, window length and sampling
+    rate for a whole session, so band slices are resolved once here and
+    the FFT output and power arrays are reused between calls (one set per
+    thread, since the pipeline runs in the request thread pool).
+    
+    Args:
+        n_channels: Rows in the data passed to the returned function
+        n_samples: Samples per channel
+        sampling_rate: Sampling frequency in Hz
+        bands: (name, low_hz, high_hz) for each band, in output order
+        dtype: Real dtype of the data (float32 keeps the FFT in single precision)
+    """
+    freqs = rfftfreq(n_samples, 1/sampling_rate)
+    n_bins = freqs.size
+    
+    # rFFT frequencies increase monotonically, so each band is a contiguous
+    # run of bins. Bands with no bins at this resolution report zero power.
+    band_slices = []
+    for band_name, low, high in bands:
+        lo = int(np.searchsorted(freqs, low, 'left'))
+        hi = int(np.searchsorted(freqs, high, 'right'))
+        band_slices.append((band_name, slice(lo, hi) if hi > lo else None))
+    
+    complex_dtype = np.result_type(dtype, np.complex64)
+    local = threading.local()
+    
+    def spectrum(data: np.ndarray) -> Tuple[np.ndarray, Dict[str, float]]:
+        scratch = getattr(local, 'scratch', None)
+        if scratch is None:
+            scratch = local.scratch = (
+                np.empty((n_channels, n_bins), dtype=complex_dtype),
+                np.empty((n_channels, n_bins), dtype=dtype),
+                np.empty((n_channels, n_bins), dtype=dtype),
+            )
+        fft_out, power, imag_sq = scratch
+        
+        # One real-input FFT over all channels (rows), written in place
+        np.fft.rfft(data, axis=1, out=fft_out)
+        np.multiply(fft_out.real, fft_out.real, out=power)
+        np.multiply(fft_out.imag, fft_out.imag, out=imag_sq)
+        power += imag_sq
+        
+        band_powers = {
+            band_name: float(power[:, band].mean()) if band is not None else 0.0
+            for band_name, band in band_slices
+        }
+        return power, band_powers
+    
+    return spectrum
+
+
+def _firwin_edges(edges: List[Tuple[float, float, bool]],
+                  passes_nyquist: bool,
+                  sampling_rate: float) -> np.ndarray:
+    """
+    Linear-phase FIR filter built edge by edge, like MNE's default design.
+    
+    Each edge is (cutoff Hz, transition width Hz, passes below the cutoff).
+    It contributes a Hamming-window low-pass sized for its own transition
+    band (3.3 * fs / width taps), added to or subtracted from a centred
+    impulse, so wide transitions don't pay for the longest edge's length.
+    """
+    # Odd lengths throughout, so the delay is a whole number of samples
+    lengths = [int(round(3.3 / (width / sampling_rate))) for _, width, _ in edges]
+    lengths = [n + 1 - n % 2 for n in lengths]
+    n_taps = int(np.ceil(3.3 * sampling_rate / min(width for _, width, _ in edges)))
+    n_taps += 1 - n_taps % 2
+    h = np.zeros(n_taps)
+    if passes_nyquist:
+        h[n_taps // 2] = 1.0
+    for (cutoff, _, passes_below), n in zip(edges, lengths):
+        lowpass = signal.firwin(n, cutoff, window='hamming', fs=sampling_rate)
+        offset = (n_taps - n) // 2
+        h[offset:n_taps - offset] += lowpass if passes_below else -lowpass
+    return h
 
 
 class SignalProcessor:
@@ -32,11 +296,50 @@ class SignalProcessor:
             'beta': (13, 30),
             'gamma': (30, 100)
         }
+        
+        # Hashable band table for the per-layout spectrum functions
+        self._band_table = tuple((name, low, high) for name, (low, high) in self.bands.items())
+        
+        # Cleaning filters depend only on the sampling rate, so design them
+        # once. They are zero-phase FIRs with MNE's default band edges, so the
+        # 0.5-100 Hz passband stays flat like the MNE pipeline they replaced.
+        nyquist = sampling_rate / 2
+        notch_edges = []
+        for freq in (50, 60):  # power line noise
+            if freq < nyquist:
+                # Stop band freq +/- freq/400 with 0.5 Hz transitions each side
+                half_width = freq / 400 + 0.25
+                notch_edges += [(freq + half_width, 0.5, False), (freq - half_width, 0.5, True)]
+        self._notch_fir = (_firwin_edges(notch_edges, True, sampling_rate)
+                           if notch_edges else None)
+        
+        # High-pass: 0.5 Hz passband edge, 0.5 Hz transition
+        bandpass_edges = [(0.25, 0.5, False)]
+        if 100 < nyquist:
+            # Low-pass: 100 Hz passband edge, transition of 25 Hz (or up to Nyquist)
+            transition = min(25.0, nyquist - 100)
+            bandpass_edges.insert(0, (100 + transition / 2, transition, True))
+        # Otherwise the upper edge is at/above Nyquist, so only the low cut applies
+        self._bandpass_fir = _firwin_edges(bandpass_edges, False, sampling_rate)
+    
+    def _fir_filter(self, h: np.ndarray, data: np.ndarray) -> np.ndarray:
+        """
+        Zero-phase FIR filter each channel (row).
+        
+        The edges are padded with odd-reflected signal (up to the filter
+        length) to keep start-up transients out of the window, and the
+        centred 'same' convolution removes the filter's delay. Filtering
+        runs in float64 (float32 windows are promoted).
+        """
+        n_edge = max(min(h.size, data.shape[1]) - 1, 0)
+        padded = np.pad(data, ((0, 0), (n_edge, n_edge)), mode='reflect', reflect_type='odd')
+        filtered = signal.oaconvolve(padded, h[np.newaxis, :], mode='same', axes=1)
+        return filtered[:, n_edge:n_edge + data.shape[1]]
     
     def clean_signal(self, 
-                     channels: Dict[str, List[float]],
+                     channels: EEGInput,
                      apply_notch: bool = True,
-                     apply_bandpass: bool = True) -> Dict[str, List[float]]:
+                     apply_bandpass: bool = True) -> EEGBuffer:
         """
         Remove noise and artifacts from raw EEG signal.
         
@@ -48,44 +351,28 @@ class SignalProcessor:
         Returns:
             Cleaned EEG signal
         """
-        # Convert to numpy arrays
-        channel_names = list(channels.keys())
-        data = np.array([channels[ch] for ch in channel_names])
-        
-        # Create MNE RawArray for advanced filtering
-        info = create_info(
-            ch_names=channel_names,
-            sfreq=self.sampling_rate,
-            ch_types='eeg'
-        )
-        raw = RawArray(data, info, verbose=False)
+        buffer = _as_buffer(channels)
+        data = buffer.data
         
         # Apply notch filter (remove power line noise at 50Hz/60Hz)
-        if apply_notch:
-            raw.notch_filter(
-                freqs=[50, 60],
-                verbose=False
-            )
+        if apply_notch and self._notch_fir is not None:
+            data = self._fir_filter(self._notch_fir, data)
         
         # Apply bandpass filter (0.5-100 Hz keeps relevant EEG)
         if apply_bandpass:
-            raw.filter(
-                l_freq=0.5,
-                h_freq=100,
-                verbose=False
-            )
-        
-        # Convert back to dictionary format
-        cleaned_data = raw.get_data()
-        cleaned_channels = {
-            ch: cleaned_data[i].tolist()
-            for i, ch in enumerate(channel_names)
-        }
+            data = self._fir_filter(self._bandpass_fir, data)
         
-        return cleaned_channels
+        # Filtered in float64; stored back in the buffer's dtype
+        return EEGBuffer(buffer.names, data.astype(buffer.data.dtype, copy=False))
+    
+    def _spectrum_for(self, data: np.ndarray
+                      ) -> Callable[[np.ndarray], Tuple[np.ndarray, Dict[str, float]]]:
+        """Spectrum function specialized for windows shaped and typed like `data`."""
+        n_channels, n_samples = data.shape
+        return _make_spectrum(n_channels, n_samples, self.sampling_rate, self._band_table, data.dtype)
     
     def extract_frequency_bands(self, 
-                                channels: Dict[str, List[float]]) -> Dict[str, float]:
+                                channels: EEGInput) -> Dict[str, float]:
         """
         Extract power in each frequency band using FFT.
         
@@ -95,67 +382,37 @@ class SignalProcessor:
         Returns:
             Dictionary of band powers (average across channels)
         """
-        band_powers = {band: [] for band in self.bands.keys()}
-        
-        # Process each channel
-        for channel_name, data in channels.items():
-            data_array = np.array(data)
-            
-            # Compute FFT
-            n = len(data_array)
-            freqs = fftfreq(n, 1/self.sampling_rate)
-            fft_vals = fft(data_array)
-            power = np.abs(fft_vals) ** 2
-            
-            # Extract power for each band
-            for band_name, (low, high) in self.bands.items():
-                # Find frequencies in this band
-                idx = np.where((freqs >= low) & (freqs <= high))
-                
-                # Calculate average power in band
-                if len(idx[0]) > 0:
-                    band_power = np.mean(power[idx])
-                    band_powers[band_name].append(band_power)
-        
-        # Average across all channels
-        avg_band_powers = {
-            band: float(np.mean(powers)) if powers else 0.0
-            for band, powers in band_powers.items()
-        }
-        
-        return avg_band_powers
+        return FeatureContext(_as_buffer(channels), self).band_powers
     
     def compute_features(self, 
-                        channels: Dict[str, List[float]]) -> Dict[str, float]:
+                        channels: EEGInput) -> Dict[str, float]:
         """
         Compute comprehensive features for ML classification.
         
+        Band powers come first, followed by every feature registered with
+        @feature; all of them share one FeatureContext (and one FFT).
+        
         Args:
             channels: Multi-channel EEG data
             
         Returns:
             Feature dictionary for AI firewall
         """
-        # Get frequency band powers
-        band_powers = self.extract_frequency_bands(channels)
-        
-        # Calculate additional features
-        all_data = np.concatenate([np.array(data) for data in channels.values()])
+        ctx = FeatureContext(_as_buffer(channels), self)
         
-        features = {
-            **band_powers,  # Include all band powers
-            'mean_amplitude': float(np.mean(np.abs(all_data))),
-            'std_amplitude': float(np.std(all_data)),
-            'beta_alpha_ratio': band_powers['beta'] / (band_powers['alpha'] + 1e-10),
-            'gamma_beta_ratio': band_powers['gamma'] / (band_powers['beta'] + 1e-10),
-            'num_channels': len(channels)
-        }
+        features = dict(ctx.band_powers)
+        for name, compute in FEATURES.items():
+            features[name] = compute(ctx)
         
         return features
     
+    def warm_up(self):
+        """Compile the JIT amplitude kernel so the first request doesn't pay for it."""
+        _amplitude_stats(np.zeros((1, 1), dtype=np.float32))
+    
     def process_pipeline(self, 
-                        channels: Dict[str, List[float]],
-                        clean: bool = True) -> Tuple[Dict[str, float], Dict[str, List[float]]]:
+                        channels: EEGInput,
+                        clean: bool = True) -> Tuple[Dict[str, float], EEGBuffer]:
         """
         Complete signal processing pipeline.
         
@@ -166,11 +423,13 @@ class SignalProcessor:
         Returns:
             Tuple of (features, cleaned_channels)
         """
+        buffer = _as_buffer(channels)
+        
         # Step 1: Clean signal
         if clean:
-            cleaned = self.clean_signal(channels)
+            cleaned = self.clean_signal(buffer)
         else:
-            cleaned = channels
+            cleaned = buffer
         
         # Step 2: Extract features
         features = self.compute_features(cleaned)
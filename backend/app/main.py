@@ -3,21 +3,67 @@ Main FastAPI Application.
 Neuro-Privacy Guard Backend - Neural Firewall for BCI Security.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
+import anyio
 
 from app.config import settings
+
+# Optionally swap scikit-learn estimators for Intel oneDAL implementations.
+# This has to happen before the routes import the AI firewall (and sklearn).
+if settings.USE_SKLEARNEX:
+    try:
+        from sklearnex import patch_sklearn
+        patch_sklearn()
+    except ImportError:
+        print("USE_SKLEARNEX is set but scikit-learn-intelex is not installed")
+
 from app.models.schemas import HealthCheck, APIResponse
 from app.api.routes import signal, privacy, permissions, threats
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run startup and shutdown tasks."""
+    # Size the worker pool used for blocking signal processing so a few slow
+    # requests can't exhaust it
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREAD_LIMITER_TOKENS
+    
+    from app.core.ai_firewall import intent_classifier, permission_gate
+    intent_classifier.warm_up()
+    signal.signal_processor.warm_up()
+    
+    # Seed initial demo data
+    permission_gate.grant_permission("vr-arena", "VR Training Arena", "motor_intent")
+    permission_gate.grant_permission("meditation-app", "Mindful Meditation", "emotional_state")
+    permission_gate.grant_permission("mind-focus", "Productivity Tracker", "focus_level")
+
+    print("=" * 60)
+    print("🧠 Neuro-Privacy Guard Backend Starting...")
+    print(f"📡 Version: {settings.APP_VERSION}")
+    print(f"🔧 Environment: {settings.ENVIRONMENT}")
+    print(f"🌐 CORS Origins: {settings.cors_origins}")
+    print(f"🔒 Privacy Level: {settings.DEFAULT_PRIVACY_LEVEL}")
+    print("=" * 60)
+    print("✅ Neural Firewall Active")
+    print(f"📚 API Documentation: http://{settings.HOST}:{settings.PORT}/docs")
+    print("=" * 60)
+    
+    yield
+    
+    print("🛑 Neuro-Privacy Guard shutting down...")
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Neuro-Privacy Guard API",
     description="Neural Firewall for Brain-Computer Interface Security",
     version=settings.APP_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS for frontend
@@ -82,33 +128,6 @@ async def health_check():
     )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Run on application startup."""
-    # Seed initial demo data
-    from app.core.ai_firewall import permission_gate
-    permission_gate.grant_permission("vr-arena", "VR Training Arena", "motor_intent")
-    permission_gate.grant_permission("meditation-app", "Mindful Meditation", "emotional_state")
-    permission_gate.grant_permission("mind-focus", "Productivity Tracker", "focus_level")
-
-    print("=" * 60)
-    print("🧠 Neuro-Privacy Guard Backend Starting...")
-    print(f"📡 Version: {settings.APP_VERSION}")
-    print(f"🔧 Environment: {settings.ENVIRONMENT}")
-    print(f"🌐 CORS Origins: {settings.cors_origins}")
-    print(f"🔒 Privacy Level: {settings.DEFAULT_PRIVACY_LEVEL}")
-    print("=" * 60)
-    print("✅ Neural Firewall Active")
-    print(f"📚 API Documentation: http://{settings.HOST}:{settings.PORT}/docs")
-    print("=" * 60)
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Run on application shutdown."""
-    print("🛑 Neuro-Privacy Guard shutting down...")
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
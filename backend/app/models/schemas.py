@@ -3,27 +3,53 @@ Pydantic models for API request/response validation.
 Defines the data structures for the Neuro-Privacy Guard API.
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import List, Dict, Optional, Literal
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, WithJsonSchema, field_validator
+from typing import Annotated, Any, List, Dict, Optional, Literal
 from datetime import datetime
 from enum import Enum
+import numpy as np
 
 
 # ============================================================================
 # EEG Signal Models
 # ============================================================================
 
+def _as_channel_array(value: Any) -> np.ndarray:
+    """Convert one channel's samples to a 1-D float32 array in a single NumPy call."""
+    try:
+        samples = np.asarray(value, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise ValueError("Channel samples must be a list of numbers")
+    if samples.ndim != 1:
+        raise ValueError("Channel samples must be a flat list of numbers")
+    if not np.isfinite(samples).all():
+        # Also catches nulls, which NumPy turns into NaN
+        raise ValueError("Channel samples must be finite numbers")
+    return samples
+
+
+# Channel samples, validated as one array instead of float-by-float
+EEGArray = Annotated[
+    np.ndarray,
+    BeforeValidator(_as_channel_array),
+    WithJsonSchema({'type': 'array', 'items': {'type': 'number'}}),
+]
+
+
 class EEGSignalInput(BaseModel):
     """Raw EEG signal input from BCI device or synthetic generator."""
     
-    channels: Dict[str, List[float]] = Field(
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
+    channels: Dict[str, EEGArray] = Field(
         ..., 
         description="Multi-channel EEG data, e.g., {'C3': [0.1, 0.2, ...], 'C4': [...]}"
     )
     sampling_rate: int = Field(256, description="Sampling rate in Hz")
     timestamp: Optional[datetime] = Field(default_factory=datetime.now)
     
-    @validator('channels')
+    @field_validator('channels')
+    @classmethod
     def validate_channels(cls, v):
         """Ensure all channels have data."""
         if not v:
@@ -3,9 +3,96 @@ Synthetic EEG Signal Generator for Neuro-Privacy Guard.
 Creates realistic multi-channel EEG data for testing without hardware.
 """
 
+import math
 import numpy as np
-from typing import Dict, List, Literal
-import mne
+import threading
+from functools import lru_cache
+from scipy.fft import irfft
+from typing import Dict, List, Literal, Optional, Tuple, Union
+
+
+def _period_samples(freqs: np.ndarray, sampling_rate: int) -> Optional[int]:
+    """
+    Length in samples after which a sum of sinusoids at `freqs` repeats.
+    
+    With integer frequencies and sampling rate that is
+    sampling_rate / gcd(sampling_rate, *freqs); otherwise None.
+    """
+    if sampling_rate != int(sampling_rate) or not np.all(freqs == np.round(freqs)):
+        return None
+    return int(sampling_rate) // math.gcd(int(sampling_rate), *(int(f) for f in freqs))
+
+
+# Characteristic frequency components per brain state:
+# state -> (amplitudes, frequencies in Hz), float32 since signals are ~±2
+_STATE_COMPONENTS = {
+    state: (np.array(amps, dtype=np.float32), np.array(freqs, dtype=np.float32))
+    for state, (amps, freqs) in {
+        # High beta (focus, concentration): beta, gamma, alpha
+        "focused": ([0.6, 0.3, 0.2], [20.0, 40.0, 10.0]),
+        # High alpha (calm, relaxed): alpha, theta, beta
+        "relaxed": ([0.7, 0.2, 0.1], [10.0, 6.0, 15.0]),
+        # High beta and gamma (anxiety, stress): high beta, gamma, theta
+        "stressed": ([0.7, 0.5, 0.4], [25.0, 45.0, 7.0]),
+        # Balanced across bands: delta, theta, alpha, beta, gamma
+        "neutral": ([0.3, 0.3, 0.4, 0.3, 0.2], [3.0, 6.0, 10.0, 18.0, 35.0]),
+    }.items()
+}
+
+# Standard deviation of the additive sensor noise, as float32 so scaling the
+# float32 draw stays in single precision
+_NOISE_STD = np.float32(0.1)
+
+# Brain state simulated for each intent type (anything else is subconscious)
+_INTENT_STATES = {
+    # Intentional commands = focused motor planning
+    # Characterized by strong beta in motor cortex (C3, C4)
+    "intentional": "focused",
+    # Subconscious = emotional or memory-related
+    # More theta/alpha, less organized beta
+    "subconscious": "stressed",
+}
+
+
+@lru_cache(maxsize=64)
+def _cached_base(brain_state: str, n_samples: int, sampling_rate: int) -> np.ndarray:
+    """
+    The state waveform for n_samples at t = i / sampling_rate, as float32.
+    
+    It is the same for every channel and every request with the same key,
+    so it is built once (one period, tiled) and shared read-only; callers
+    only add fresh noise on top.
+    """
+    amps, freqs = _STATE_COMPONENTS[brain_state]
+    period = _period_samples(freqs, sampling_rate)
+    wave = None if period is None else _period_wave(amps, freqs, period, sampling_rate)
+    if wave is None:
+        length = n_samples if period is None else min(period, n_samples)
+        omega_t = (2.0 * np.pi / sampling_rate) * np.arange(length, dtype=np.float64)
+        # Sum of the state's sinusoids: (bands,) @ (bands, samples)
+        wave = amps @ np.sin(np.outer(freqs, omega_t))
+    # Synthesized in float64 once, stored in float32 like the rest of the signal
+    base = np.resize(wave.astype(np.float32), n_samples)
+    base.setflags(write=False)
+    return base
+
+
+def _period_wave(amps: np.ndarray, freqs: np.ndarray,
+                 period: int, sampling_rate: int) -> Optional[np.ndarray]:
+    """
+    One period of the state waveform from its sparse spectrum, via irfft.
+    
+    Over one period each component completes a whole number of cycles, so
+    it sits exactly on an FFT bin and needs no sin evaluations. Returns
+    None if a component is at or above Nyquist and can't be placed.
+    """
+    bins = np.rint(freqs.astype(np.float64) * period / sampling_rate).astype(np.intp)
+    if 2 * bins.max() >= period:
+        return None
+    spectrum = np.zeros(period // 2 + 1, dtype=np.complex128)
+    # irfft maps bin k = -0.5j * amp * n to amp * sin(2*pi*k*i/n)
+    np.add.at(spectrum, bins, -0.5j * period * amps.astype(np.float64))
+    return irfft(spectrum, n=period)
 
 
 class SyntheticEEGGenerator:
@@ -13,13 +100,15 @@ class SyntheticEEGGenerator:
     
     def __init__(self, 
                  sampling_rate: int = 256,
-                 num_channels: int = 8):
+                 num_channels: int = 8,
+                 seed: Optional[int] = None):
         """
         Initialize the EEG generator.
         
         Args:
             sampling_rate: Sampling frequency in Hz
             num_channels: Number of EEG channels
+            seed: Seed for the noise generator (None = fresh entropy)
         """
         self.sampling_rate = sampling_rate
         self.num_channels = num_channels
@@ -29,81 +118,92 @@ class SyntheticEEGGenerator:
             'Fp1', 'Fp2', 'F3', 'F4', 'C3', 'C4', 'P3', 'P4',
             'O1', 'O2', 'F7', 'F8', 'T3', 'T4', 'T5', 'T6'
         ][:num_channels]
+        
+        # One PCG64 generator per instance instead of the global legacy RNG
+        self._rng = np.random.default_rng(seed)
+        
+        # Noise scratch space sized for the longest duration the API allows
+        # (10 s), kept per thread since generate() runs in worker threads
+        self._max_samples = int(10.0 * sampling_rate)
+        self._local = threading.local()
+    
+    def _noise_buffer(self, n_samples: int) -> np.ndarray:
+        """Return a reusable (channels, n_samples) scratch array for this thread."""
+        size = len(self.channel_names) * n_samples
+        buf = getattr(self._local, 'noise', None)
+        if buf is None or buf.size < size:
+            buf = np.empty(max(size, len(self.channel_names) * self._max_samples), dtype=np.float32)
+            self._local.noise = buf
+        # Contiguous prefix so the RNG can fill it in place
+        return buf[:size].reshape(len(self.channel_names), n_samples)
     
     def generate(self, 
                  duration: float = 2.0,
-                 brain_state: Literal["focused", "relaxed", "stressed", "neutral"] = "neutral"
-                ) -> Dict[str, List[float]]:
+                 brain_state: Literal["focused", "relaxed", "stressed", "neutral"] = "neutral",
+                 return_ndarray: bool = False
+                ) -> Union[Dict[str, List[float]], Tuple[List[str], np.ndarray]]:
         """
         Generate synthetic EEG data.
         
         Args:
             duration: Signal duration in seconds
             brain_state: Target brain state to simulate
+            return_ndarray: Return the samples as one array instead of lists
             
         Returns:
-            Dictionary mapping channel names to signal arrays
+            Dictionary mapping channel names to signal arrays, or with
+            return_ndarray, (channel_names, samples of shape (channels, n_samples))
         """
         n_samples = int(duration * self.sampling_rate)
-        time = np.linspace(0, duration, n_samples)
-        
-        # Generate base signals for each channel
-        signals = {}
         
-        for channel in self.channel_names:
-            # Create multi-frequency signal based on brain state
-            signal = self._generate_channel_signal(time, brain_state)
-            
-            # Add realistic noise
-            noise = np.random.normal(0, 0.1, n_samples)
-            signal = signal + noise
-            
-            signals[channel] = signal.tolist()
+        # An array the caller keeps is filled directly; the list path only
+        # needs scratch space, so it reuses this thread's preallocated buffer
+        if return_ndarray:
+            noise = np.empty((len(self.channel_names), n_samples), dtype=np.float32)
+        else:
+            noise = self._noise_buffer(n_samples)
+        self._fill(noise, brain_state)
         
-        return signals
+        if return_ndarray:
+            return list(self.channel_names), noise
+        return dict(zip(self.channel_names, noise.tolist()))
     
-    def _generate_channel_signal(self, 
-                                  time: np.ndarray, 
-                                  brain_state: str) -> np.ndarray:
+    def generate_batch(self,
+                       n_trials: int,
+                       duration: float = 2.0,
+                       brain_state: Literal["focused", "relaxed", "stressed", "neutral"] = "neutral"
+                      ) -> np.ndarray:
         """
-        Generate signal for a single channel based on brain state.
+        Generate many trials of synthetic EEG at once.
         
-        Brain states have characteristic frequency band profiles:
-        - Focused: High beta (13-30Hz), moderate gamma
-        - Relaxed: High alpha (8-13Hz), low beta
-        - Stressed: High beta, high gamma, elevated theta
-        - Neutral: Balanced across bands
-        """
-        signal = np.zeros_like(time)
+        All trials share one noise draw and one base waveform lookup, which
+        is much cheaper than calling generate() per trial.
         
-        # Define frequency band characteristics for each state
-        if brain_state == "focused":
-            # High beta (focus, concentration)
-            signal += 0.6 * np.sin(2 * np.pi * 20 * time)  # Beta
-            signal += 0.3 * np.sin(2 * np.pi * 40 * time)  # Gamma
-            signal += 0.2 * np.sin(2 * np.pi * 10 * time)  # Alpha
-            
-        elif brain_state == "relaxed":
-            # High alpha (calm, relaxed)
-            signal += 0.7 * np.sin(2 * np.pi * 10 * time)  # Alpha
-            signal += 0.2 * np.sin(2 * np.pi * 6 * time)   # Theta
-            signal += 0.1 * np.sin(2 * np.pi * 15 * time)  # Beta
-            
-        elif brain_state == "stressed":
-            # High beta and gamma (anxiety, stress)
-            signal += 0.7 * np.sin(2 * np.pi * 25 * time)  # High Beta
-            signal += 0.5 * np.sin(2 * np.pi * 45 * time)  # Gamma
-            signal += 0.4 * np.sin(2 * np.pi * 7 * time)   # Theta
+        Args:
+            n_trials: Number of trials
+            duration: Signal duration of each trial in seconds
+            brain_state: Target brain state to simulate
             
-        else:  # neutral
-            # Balanced across bands
-            signal += 0.3 * np.sin(2 * np.pi * 3 * time)   # Delta
-            signal += 0.3 * np.sin(2 * np.pi * 6 * time)   # Theta
-            signal += 0.4 * np.sin(2 * np.pi * 10 * time)  # Alpha
-            signal += 0.3 * np.sin(2 * np.pi * 18 * time)  # Beta
-            signal += 0.2 * np.sin(2 * np.pi * 35 * time)  # Gamma
+        Returns:
+            float32 array of shape (n_trials, channels, n_samples), with
+            channels in `channel_names` order
+        """
+        n_samples = int(duration * self.sampling_rate)
+        trials = np.empty((n_trials, len(self.channel_names), n_samples), dtype=np.float32)
+        self._fill(trials, brain_state)
+        return trials
+    
+    def _fill(self, out: np.ndarray, brain_state: str):
+        """Fill `out` (..., n_samples) with noise plus the state waveform, in place."""
+        # Realistic noise for all channels (and trials) in one draw
+        self._rng.standard_normal(dtype=np.float32, out=out)
+        out *= _NOISE_STD
         
-        return signal
+        # Every channel shares the same state waveform; it is cached, so
+        # repeat requests do no sin work at all
+        if brain_state not in _STATE_COMPONENTS:
+            brain_state = "neutral"
+        out += _cached_base(brain_state, out.shape[-1], self.sampling_rate)
     
     def generate_with_intent(self, 
                             duration: float = 2.0,
@@ -119,14 +219,7 @@ class SyntheticEEGGenerator:
         Returns:
             Dictionary mapping channel names to signal arrays
         """
-        if intent == "intentional":
-            # Intentional commands = focused motor planning
-            # Characterized by strong beta in motor cortex (C3, C4)
-            return self.generate(duration, "focused")
-        else:
-            # Subconscious = emotional or memory-related
-            # More theta/alpha, less organized beta
-            return self.generate(duration, "stressed")
+        return self.generate(duration, _INTENT_STATES.get(intent, "stressed"))
 
 
 # Convenience function
@@ -134,7 +227,8 @@ def generate_synthetic_eeg(
     duration: float = 2.0,
     brain_state: str = "neutral",
     sampling_rate: int = 256,
-    num_channels: int = 8
+    num_channels: int = 8,
+    seed: Optional[int] = None
 ) -> Dict[str, List[float]]:
     """
     Quick function to generate synthetic EEG.
@@ -144,9 +238,10 @@ def generate_synthetic_eeg(
         brain_state: Brain state to simulate
         sampling_rate: Sampling frequency in Hz
         num_channels: Number of channels
+        seed: Seed for reproducible noise
         
     Returns:
         Multi-channel EEG data
     """
-    generator = SyntheticEEGGenerator(sampling_rate, num_channels)
+    generator = SyntheticEEGGenerator(sampling_rate, num_channels, seed)
     return generator.generate(duration, brain_state)
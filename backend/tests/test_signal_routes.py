@@ -0,0 +1,71 @@
+"""
+Tests for the signal routes' content negotiation.
+"""
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import signal
+from app.api.routes.signal import _wants_binary
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    app.include_router(signal.router, prefix="/api/v1/signal")
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _synthetic(client: TestClient, accept: str):
+    return client.post("/api/v1/signal/synthetic", json={"duration": 1.0},
+                       headers={"Accept": accept})
+
+
+def test_synthetic_binary_when_octet_stream_accepted(client):
+    response = _synthetic(client, "application/octet-stream")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    n_channels = int(response.headers["X-Num-Channels"])
+    n_samples = int(response.headers["X-Num-Samples"])
+    samples = np.frombuffer(response.content, dtype='<f4')
+    assert samples.size == n_channels * n_samples
+    assert len(response.headers["X-Channel-Names"].split(",")) == n_channels
+
+
+def test_synthetic_json_by_default(client):
+    response = _synthetic(client, "application/json")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    body = response.json()
+    assert body["success"] is True
+    assert body["data"]["channels"]
+
+
+def test_synthetic_json_when_octet_stream_refused(client):
+    response = _synthetic(client, "application/json, application/octet-stream;q=0")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json()["data"]["channels"]
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, False),
+    ("*/*", False),
+    ("application/*", False),
+    ("application/octet-stream", True),
+    ("application/json, application/octet-stream", True),
+    ("application/octet-stream;q=0", False),
+    ("application/octet-stream;q=0.5, application/json", False),
+    ("application/octet-stream, application/json;q=0.9", True),
+    ("application/octet-stream, */*;q=0.1", True),
+    ("application/json;q=0.2, application/*;q=0.8", True),
+    ("application/octet-stream;q=bogus", False),
+])
+def test_wants_binary_honours_q_values(accept, expected):
+    assert _wants_binary(accept) is expected